@@ -1,17 +1,52 @@
 """User-facing functions."""
 import html
+import importlib
+import operator
+import string
 import textwrap
-from collections import defaultdict
-from typing import Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from math import prod
+from typing import Callable, Dict, Optional, Tuple, Union
 
 import dask
 import dask.array
 import zarr
 from packaging.version import Version
 
-from rechunker.algorithm import rechunking_plan
+from rechunker.algorithm import multistage_rechunking_plan
+from rechunker.bufferpool import BufferPool
 from rechunker.pipeline import CopySpecToPipelinesMixin
-from rechunker.types import ArrayProxy, CopySpec, CopySpecExecutor
+from rechunker.types import ArrayProxy, CopySpec, CopySpecExecutor, StagedCopySpec
+
+_RECHUNKED_HTML = textwrap.dedent(
+    """\
+    <h2>Rechunked</h2>
+    <details>
+      <summary><b>Source</b></summary>
+      $source_html
+    </details>
+    {}<details>
+      <summary><b>Target</b></summary>
+      $target_html
+    </details>
+    """
+)
+
+_RECHUNKED_HTML_INTERMEDIATE = textwrap.dedent(
+    """\
+    <details>
+      <summary><b>Intermediate</b></summary>
+      $intermediate_html
+    </details>
+    """
+)
+
+_RECHUNKED_HTML_TEMPLATE = string.Template(
+    _RECHUNKED_HTML.format(_RECHUNKED_HTML_INTERMEDIATE)
+)
+_RECHUNKED_HTML_TEMPLATE_NO_INTERMEDIATE = string.Template(_RECHUNKED_HTML.format(""))
 
 
 class Rechunked:
@@ -90,43 +125,22 @@ class Rechunked:
             try:
                 body = obj._repr_html_()
             except AttributeError:
-                body = f"<p><code>{html.escape(repr(self._target))}</code></p>"
+                body = f"<p><code>{html.escape(repr(obj))}</code></p>"
             entries[f"{kind}_html"] = body
 
-        template = textwrap.dedent(
-            """<h2>Rechunked</h2>\
-
-        <details>
-          <summary><b>Source</b></summary>
-          {{source_html}}
-        </details>
-        {}
-        <details>
-          <summary><b>Target</b></summary>
-          {{target_html}}
-        </details>
-        """
-        )
-
         if self._intermediate is not None:
-            intermediate = textwrap.dedent(
-                """\
-                <details>
-                <summary><b>Intermediate</b></summary>
-                {intermediate_html}
-                </details>
-            """
-            )
+            template = _RECHUNKED_HTML_TEMPLATE
         else:
-            intermediate = ""
-        template = template.format(intermediate)
-        return template.format(**entries)
+            template = _RECHUNKED_HTML_TEMPLATE_NO_INTERMEDIATE
+        return template.substitute(entries)
 
 
 def _shape_dict_to_tuple(dims, shape_dict):
     # convert a dict of shape
-    shape = [shape_dict[dim] for dim in dims]
-    return tuple(shape)
+    if len(dims) > 1:
+        return operator.itemgetter(*dims)(shape_dict)
+    # itemgetter doesn't return a tuple for fewer than two items
+    return tuple(shape_dict[dim] for dim in dims)
 
 
 def _get_dims_from_zarr_array(z_array):
@@ -141,6 +155,36 @@ def _encode_zarr_attributes(attrs):
     return {k: encode_zarr_attr_value(v) for k, v in attrs.items()}
 
 
+def _map_in_threads(function, items, max_workers):
+    # like ``list(map(function, items))``, optionally using a thread pool
+    if max_workers <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(function, items))
+
+
+class _DeferredGroup:
+    """A Zarr group which is only created in its store when first requested."""
+
+    def __init__(self, store_or_group):
+        self._store_or_group = store_or_group
+        self._lock = threading.Lock()
+
+    @property
+    def group(self):
+        """The group, or None if it hasn't been created."""
+        if isinstance(self._store_or_group, zarr.Group):
+            return self._store_or_group
+        return None
+
+    def get(self):
+        """Return the group, creating it if needed."""
+        with self._lock:
+            if not isinstance(self._store_or_group, zarr.Group):
+                self._store_or_group = zarr.group(self._store_or_group)
+        return self._store_or_group
+
+
 def _zarr_empty(shape, store_or_group, chunks, dtype, name=None, **kwargs):
     # wrapper that maybe creates the array within a group
     if isinstance(store_or_group, zarr.Group):
@@ -155,7 +199,7 @@ def _zarr_empty(shape, store_or_group, chunks, dtype, name=None, **kwargs):
         )
 
 
-ZARR_OPTIONS = [
+_ZARR_OPTIONS_LIST = (
     "compressor",
     "filters",
     "order",
@@ -163,56 +207,55 @@ ZARR_OPTIONS = [
     "cache_attrs",
     "overwrite",
     "write_empty_chunks",
-]
+)
+ZARR_OPTIONS = frozenset(_ZARR_OPTIONS_LIST)
 
 
 def _validate_options(options):
     if not options:
         return
-    for o in options:
-        if o not in ZARR_OPTIONS:
-            raise ValueError(
-                f"Zarr options must not include {o} (got {o}={options[o]}). "
-                f"Only the following options are supported: {ZARR_OPTIONS}."
-            )
-
-
-def _get_executor(name: str) -> CopySpecExecutor:
-    # converts a string name into a Executor instance
-    # imports are conditional to avoid hard dependencies
-    if name.lower() == "dask":
-        from rechunker.executors.dask import DaskPipelineExecutor
-
-        class DaskCopySpecExecutor(DaskPipelineExecutor, CopySpecToPipelinesMixin):
-            pass
-
-        return DaskCopySpecExecutor()
-    elif name.lower() == "beam":
-        from rechunker.executors.beam import BeamExecutor
-
-        return BeamExecutor()
-    elif name.lower() == "prefect":
-        from rechunker.executors.prefect import PrefectPipelineExecutor
-
-        class PrefectCopySpecExecutor(
-            PrefectPipelineExecutor, CopySpecToPipelinesMixin
-        ):
-            pass
+    unsupported = options.keys() - ZARR_OPTIONS
+    if unsupported:
+        # report the first unsupported option, in the order it was given
+        o = next(o for o in options if o in unsupported)
+        raise ValueError(
+            f"Zarr options must not include {o} (got {o}={options[o]}). "
+            f"Only the following options are supported: {list(_ZARR_OPTIONS_LIST)}."
+        )
 
-        return PrefectCopySpecExecutor()
-    elif name.lower() == "python":
-        from rechunker.executors.python import PythonPipelineExecutor
 
-        class PythonCopySpecExecutor(PythonPipelineExecutor, CopySpecToPipelinesMixin):
-            pass
+# executor name -> (module, class name, whether the class executes pipelines and
+# needs to be wrapped to accept copy specs); modules are only imported when
+# requested, to avoid hard dependencies
+_EXECUTOR_REGISTRY = {
+    "dask": ("rechunker.executors.dask", "DaskPipelineExecutor", True),
+    "beam": ("rechunker.executors.beam", "BeamExecutor", False),
+    "prefect": ("rechunker.executors.prefect", "PrefectPipelineExecutor", True),
+    "python": ("rechunker.executors.python", "PythonPipelineExecutor", True),
+    "pywren": ("rechunker.executors.pywren", "PywrenExecutor", False),
+}
 
-        return PythonCopySpecExecutor()
-    elif name.lower() == "pywren":
-        from rechunker.executors.pywren import PywrenExecutor
 
-        return PywrenExecutor()
-    else:
+def _get_executor(name: str) -> CopySpecExecutor:
+    # converts a string name into a Executor instance
+    try:
+        entry = _EXECUTOR_REGISTRY[name.lower()]
+    except KeyError:
         raise ValueError(f"unrecognized executor {name}")
+    return _load_executor(*entry)
+
+
+@lru_cache(maxsize=None)
+def _load_executor(module_name, class_name, is_pipeline_executor):
+    # executors are stateless, so one instance of each is shared
+    executor_class = getattr(importlib.import_module(module_name), class_name)
+    if is_pipeline_executor:
+        executor_class = type(
+            class_name.replace("Pipeline", "CopySpec"),
+            (executor_class, CopySpecToPipelinesMixin),
+            {},
+        )
+    return executor_class()
 
 
 def rechunk(
@@ -225,6 +268,8 @@ def rechunk(
     temp_options=None,
     executor: Union[str, CopySpecExecutor] = "dask",
     array_name=None,
+    min_mem=None,
+    setup_workers=1,
 ) -> Rechunked:
     """
     Rechunk a Zarr Array or Group, a Dask Array, or an Xarray Dataset
@@ -292,6 +337,18 @@ def rechunk(
 
     array_name: str, optional
         Required when rechunking an array if any of the targets is a group
+    min_mem : str or int, optional
+        The minimum amount of memory (in bytes) that intermediate chunks should
+        use. If provided, rechunking may be split into multiple stages, each
+        with its own temporary arrays, to avoid the very large number of tiny
+        intermediate chunks required by some single stage rechunks (e.g. from
+        ``(1, N)`` to ``(N, 1)`` chunks). For best results, ``max_mem`` should be
+        significantly larger than ``min_mem`` (e.g. 10x).
+    setup_workers : int, optional
+        Number of threads used to create the target and temporary arrays of
+        a Zarr Group or Xarray Dataset concurrently, which hides some of the
+        latency of remote stores. Only use more than one thread with stores
+        that support concurrent writes.
 
 
     Returns
@@ -310,6 +367,8 @@ def rechunk(
         temp_store=temp_store,
         temp_options=temp_options,
         array_name=array_name,
+        min_mem=min_mem,
+        setup_workers=setup_workers,
     )
     plan = executor.prepare_plan(copy_spec)
     return Rechunked(executor, plan, source, intermediate, target)
@@ -341,26 +400,44 @@ def parse_target_chunks_from_dim_chunks(ds, target_chunks):
     - If a dimension chunk is specified as -1, again, use the full length from the dataset.
 
     """
-    group_chunks = defaultdict(list)
-
+    dim_lengths = dict(ds.sizes)
+    # normalize the requested chunks once, rather than once per variable
+    dim_chunks = {
+        dim: dim_lengths[dim] if chunk > dim_lengths[dim] or chunk < 0 else chunk
+        for dim, chunk in target_chunks.items()
+        if dim in dim_lengths
+    }
+
+    group_chunks = {}
     for var in ds.variables:
-        for dim in ds[var].dims:
-            group_chunks[var].append(get_dim_chunk(ds[var], dim, target_chunks))
-
-    # rechunk() expects chunks values to be a tuple. So let's convert them
-    group_chunks_tuples = {var: tuple(chunks) for (var, chunks) in group_chunks.items()}
-    return group_chunks_tuples
+        da = ds[var]
+        if not da.dims:
+            continue
+        if isinstance(da.data, dask.array.Array):
+            existing_chunksizes = dict(zip(da.dims, da.data.chunksize))
+        else:
+            existing_chunksizes = dim_lengths
+        # rechunk() expects chunks values to be a tuple
+        group_chunks[var] = tuple(
+            dim_chunks[dim] if dim in dim_chunks else existing_chunksizes[dim]
+            for dim in da.dims
+        )
+    return group_chunks
 
 
 def _copy_group_attributes(source, target):
-    """Visit every source group and create it on the target and move any attributes found."""
+    """Copy the attributes of ``source`` and of every subgroup, creating them on the target."""
+    # each group is loaded once, and its attributes are fetched in one request
+    attrs = source.attrs.asdict()
+    if attrs:
+        target.attrs.update(attrs)
+    for name, subgroup in source.groups():
+        _copy_group_attributes(subgroup, target.require_group(name))
 
-    def _update_group_attrs(name):
-        if isinstance(source.get(name), zarr.Group):
-            group = target.create_group(name)
-            group.attrs.update(source.get(name).attrs)
 
-    source.visit(_update_group_attrs)
+def _final_stage(copy_spec):
+    # the CopySpec that writes the target array
+    return copy_spec if isinstance(copy_spec, CopySpec) else copy_spec[-1]
 
 
 def _setup_rechunk(
@@ -372,179 +449,315 @@ def _setup_rechunk(
     temp_store=None,
     temp_options=None,
     array_name=None,
+    min_mem=None,
+    setup_workers=1,
 ):
     if temp_options is None:
         temp_options = target_options
     target_options = target_options or {}
     temp_options = temp_options or {}
 
-    # import xarray dynamically since it is not a required dependency
-    try:
-        import xarray
-        from xarray.backends.zarr import (
-            DIMENSION_KEY,
-            encode_zarr_attr_value,
-            encode_zarr_variable,
-            extract_zarr_variable_encoding,
+    # parse memory limits once, rather than for every array
+    # TODO: rewrite to avoid the hard dependency on dask
+    max_mem = dask.utils.parse_bytes(max_mem)
+    if min_mem is not None:
+        min_mem = dask.utils.parse_bytes(min_mem)
+
+    setup = _setup_function_for(type(source))
+    if setup is None:
+        raise ValueError(
+            f"Source must be a Zarr Array, Zarr Group, Dask Array or Xarray Dataset (not {type(source)})."
         )
-        from xarray.conventions import encode_dataset_coordinates
-    except ImportError:
-        xarray = None
+    return setup(
+        source,
+        target_chunks,
+        max_mem,
+        target_store,
+        target_options,
+        temp_store,
+        temp_options,
+        array_name,
+        min_mem,
+        setup_workers,
+    )
 
-    if xarray and isinstance(source, xarray.Dataset):
-        if not isinstance(target_chunks, dict):
-            raise ValueError(
-                "You must specify ``target-chunks`` as a dict when rechunking a dataset."
-            )
-        if array_name is not None:
-            raise ValueError(
-                "Can't specify `array_name` when rechunking an Xarray Dataset."
-            )
 
-        variables, attrs = encode_dataset_coordinates(source)
-        attrs = _encode_zarr_attributes(attrs)
+# maps source types to the function setting up their rechunking, filled in on
+# first use since xarray is an optional dependency
+_SETUP_FUNCTIONS: Dict[type, Callable] = {}
 
-        if temp_store is not None:
-            if isinstance(temp_store, zarr.Group):
-                temp_group = temp_store
-            else:
-                temp_group = zarr.group(temp_store)
-        else:
-            temp_group = None
 
-        if isinstance(target_store, zarr.Group):
-            target_group = target_store
+def _setup_function_for(source_type):
+    if not _SETUP_FUNCTIONS:
+        setup_functions = {
+            zarr.hierarchy.Group: _setup_group_rechunk,
+            zarr.core.Array: _setup_single_array_rechunk,
+            dask.array.Array: _setup_single_array_rechunk,
+        }
+        # import xarray dynamically since it is not a required dependency
+        try:
+            import xarray
+        except ImportError:
+            pass
         else:
-            target_group = zarr.group(target_store)
-        target_group.attrs.update(attrs)
-
-        # if ``target_chunks`` is specified per dimension (xarray ``.rechunk`` style),
-        # parse chunks for each coordinate/variable
-        if all([k in source.dims for k in target_chunks.keys()]):
-            # ! We can only apply this when all keys are indeed dimension, otherwise it falls back to the old method
-            target_chunks = parse_target_chunks_from_dim_chunks(source, target_chunks)
-
-        copy_specs = []
-        for name, variable in variables.items():
-            # This isn't strictly necessary because a shallow copy
-            # also occurs in `encode_dataset_coordinates` but do it
-            # anyways in case the coord encoding function changes
-            variable = variable.copy()
-
-            # Update the array encoding with provided options and apply it;
-            # note that at this point the `options` may contain any valid property
-            # applicable for the `encoding` parameter in Dataset.to_zarr other than "chunks"
-            options = target_options.get(name, {})
-            if "chunks" in options:
-                raise ValueError(
-                    f"Chunks must be provided in 'target_chunks' rather than options (variable={name})"
-                )
-            # Drop any leftover chunks encoding
-            variable.encoding.pop("chunks", None)
-            variable.encoding.update(options)
-            variable = encode_zarr_variable(variable)
-
-            # Extract the array encoding to get a default chunking, a step
-            # which will also ensure that the target chunking is compatible
-            # with the current chunking (only necessary for on-disk arrays)
-            kws = {}
-            if Version(xarray.__version__) >= Version("2025.03.1"):
-                kws = {"zarr_format": 2}
-            variable_encoding = extract_zarr_variable_encoding(
-                variable, raise_on_invalid=False, name=name, **kws
-            )
-            variable_chunks = target_chunks.get(name, variable_encoding["chunks"])
-            if isinstance(variable_chunks, dict):
-                variable_chunks = _shape_dict_to_tuple(variable.dims, variable_chunks)
+            setup_functions[xarray.Dataset] = _setup_dataset_rechunk
+        _SETUP_FUNCTIONS.update(setup_functions)
+    for klass in source_type.__mro__:
+        setup = _SETUP_FUNCTIONS.get(klass)
+        if setup is not None:
+            return setup
+    return None
 
-            # Restrict options to only those that are specific to zarr and
-            # not managed internally
-            options = {k: v for k, v in options.items() if k in ZARR_OPTIONS}
-            _validate_options(options)
-
-            # Extract array attributes along with reserved property for
-            # xarray dimension names
-            variable_attrs = _encode_zarr_attributes(variable.attrs)
-            variable_attrs[DIMENSION_KEY] = encode_zarr_attr_value(variable.dims)
-
-            copy_spec = _setup_array_rechunk(
-                dask.array.asarray(variable),
-                variable_chunks,
-                max_mem,
-                target_group,
-                target_options=options,
-                temp_store_or_group=temp_group,
-                temp_options=options,
-                name=name,
-            )
-            copy_spec.write.array.attrs.update(variable_attrs)  # type: ignore
-            copy_specs.append(copy_spec)
 
-        return copy_specs, temp_group, target_group
+def _setup_dataset_rechunk(
+    source,
+    target_chunks,
+    max_mem,
+    target_store,
+    target_options,
+    temp_store,
+    temp_options,
+    array_name,
+    min_mem,
+    setup_workers,
+):
+    import xarray
+    from xarray.backends.zarr import (
+        DIMENSION_KEY,
+        encode_zarr_attr_value,
+        encode_zarr_variable,
+        extract_zarr_variable_encoding,
+    )
+    from xarray.conventions import encode_dataset_coordinates
+
+    if not isinstance(target_chunks, dict):
+        raise ValueError(
+            "You must specify ``target-chunks`` as a dict when rechunking a dataset."
+        )
+    if array_name is not None:
+        raise ValueError(
+            "Can't specify `array_name` when rechunking an Xarray Dataset."
+        )
 
-    elif isinstance(source, zarr.hierarchy.Group):
-        if not isinstance(target_chunks, dict):
+    variables, attrs = encode_dataset_coordinates(source)
+    attrs = _encode_zarr_attributes(attrs)
+
+    # if ``target_chunks`` is specified per dimension (xarray ``.rechunk`` style),
+    # parse chunks for each coordinate/variable
+    if all([k in source.dims for k in target_chunks.keys()]):
+        # ! We can only apply this when all keys are indeed dimension, otherwise it falls back to the old method
+        target_chunks = parse_target_chunks_from_dim_chunks(source, target_chunks)
+
+    # resolve the requested chunks of every variable up front, so that invalid
+    # arguments are reported before anything is written to the target store
+    var_chunks = {}
+    for name, variable in variables.items():
+        if "chunks" in target_options.get(name, {}):
             raise ValueError(
-                "You must specify ``target-chunks`` as a dict when rechunking a group."
+                f"Chunks must be provided in 'target_chunks' rather than options (variable={name})"
             )
-        if array_name is not None:
-            raise ValueError("Can't specify `array_name` when rechunking a Group.")
-
-        if temp_store is not None:
-            if isinstance(temp_store, zarr.Group):
-                temp_group = temp_store
-            else:
-                temp_group = zarr.group(temp_store)
-        else:
-            temp_group = None
-
-        if isinstance(target_store, zarr.Group):
-            target_group = target_store
-        else:
-            target_group = zarr.group(target_store)
-        _copy_group_attributes(source, target_group)
-        target_group.attrs.update(source.attrs)
-
-        copy_specs = []
-        for array_name, array_target_chunks in target_chunks.items():
-            copy_spec = _setup_array_rechunk(
-                source[array_name],
-                array_target_chunks,
-                max_mem,
-                target_group,
-                target_options=target_options.get(array_name),
-                temp_store_or_group=temp_group,
-                temp_options=temp_options.get(array_name),
-                name=array_name,
+        variable_chunks = target_chunks.get(name)
+        if isinstance(variable_chunks, dict):
+            try:
+                variable_chunks = _shape_dict_to_tuple(variable.dims, variable_chunks)
+            except KeyError:
+                raise KeyError(
+                    "You must explicitly specify each dimension size in target_chunks. "
+                    f"Got dims {variable.dims}, target_chunks {variable_chunks} (variable={name})."
+                )
+        if variable_chunks is not None and len(variable_chunks) != variable.ndim:
+            raise ValueError(
+                f"target_chunks {variable_chunks} don't match the dimensions {variable.dims} (variable={name})."
             )
-            copy_specs.append(copy_spec)
+        var_chunks[name] = variable_chunks
 
-        return copy_specs, temp_group, target_group
+    # only create the temporary group if some array needs an intermediate
+    temp_group = None if temp_store is None else _DeferredGroup(temp_store)
 
-    elif isinstance(source, (zarr.core.Array, dask.array.Array)):
-        if (
-            isinstance(target_store, zarr.Group) or isinstance(temp_store, zarr.Group)
-        ) and array_name is None:
-            raise ValueError("Can't rechunk to a group without a name for the array.")
+    if isinstance(target_store, zarr.Group):
+        target_group = target_store
+    else:
+        target_group = zarr.group(target_store)
+    target_group.attrs.update(attrs)
+
+    def setup_variable(item):
+        name, variable = item
+        # This isn't strictly necessary because a shallow copy
+        # also occurs in `encode_dataset_coordinates` but do it
+        # anyways in case the coord encoding function changes
+        variable = variable.copy()
+
+        # Update the array encoding with provided options and apply it;
+        # note that at this point the `options` may contain any valid property
+        # applicable for the `encoding` parameter in Dataset.to_zarr other than "chunks"
+        options = target_options.get(name, {})
+        # Drop any leftover chunks encoding
+        variable.encoding.pop("chunks", None)
+        variable.encoding.update(options)
+        variable = encode_zarr_variable(variable)
+
+        # Extract the array encoding to get a default chunking, a step
+        # which will also ensure that the target chunking is compatible
+        # with the current chunking (only necessary for on-disk arrays)
+        kws = {}
+        if Version(xarray.__version__) >= Version("2025.03.1"):
+            kws = {"zarr_format": 2}
+        variable_encoding = extract_zarr_variable_encoding(
+            variable, raise_on_invalid=False, name=name, **kws
+        )
+        variable_chunks = var_chunks[name]
+        if variable_chunks is None:
+            variable_chunks = variable_encoding["chunks"]
+
+        # Restrict options to only those that are specific to zarr and
+        # not managed internally
+        options = {k: v for k, v in options.items() if k in ZARR_OPTIONS}
+        _validate_options(options)
+
+        # Extract array attributes along with reserved property for
+        # xarray dimension names
+        variable_attrs = _encode_zarr_attributes(variable.attrs)
+        variable_attrs[DIMENSION_KEY] = encode_zarr_attr_value(variable.dims)
+
+        copy_spec, _ = _setup_array_rechunk(
+            dask.array.asarray(variable),
+            variable_chunks,
+            max_mem,
+            target_group,
+            target_options=options,
+            temp_store_or_group=temp_group,
+            temp_options=options,
+            name=name,
+            min_mem=min_mem,
+        )
+        _final_stage(copy_spec).write.array.attrs.update(variable_attrs)  # type: ignore
+        return copy_spec
 
-        copy_spec = _setup_array_rechunk(
-            source,
-            target_chunks,
+    copy_specs = _map_in_threads(setup_variable, list(variables.items()), setup_workers)
+
+    intermediate = None if temp_group is None else temp_group.group
+    return copy_specs, intermediate, target_group
+
+
+def _setup_group_rechunk(
+    source,
+    target_chunks,
+    max_mem,
+    target_store,
+    target_options,
+    temp_store,
+    temp_options,
+    array_name,
+    min_mem,
+    setup_workers,
+):
+    if not isinstance(target_chunks, dict):
+        raise ValueError(
+            "You must specify ``target-chunks`` as a dict when rechunking a group."
+        )
+    if array_name is not None:
+        raise ValueError("Can't specify `array_name` when rechunking a Group.")
+
+    # only create the temporary group if some array needs an intermediate
+    temp_group = None if temp_store is None else _DeferredGroup(temp_store)
+
+    if isinstance(target_store, zarr.Group):
+        target_group = target_store
+    else:
+        target_group = zarr.group(target_store)
+    _copy_group_attributes(source, target_group)
+
+    def setup_array(item):
+        array_name, array_target_chunks = item
+        copy_spec, _ = _setup_array_rechunk(
+            source[array_name],
+            array_target_chunks,
             max_mem,
-            target_store,
-            target_options=target_options,
-            temp_store_or_group=temp_store,
-            temp_options=temp_options,
+            target_group,
+            target_options=target_options.get(array_name),
+            temp_store_or_group=temp_group,
+            temp_options=temp_options.get(array_name),
             name=array_name,
+            min_mem=min_mem,
         )
+        return copy_spec
+
+    copy_specs = _map_in_threads(
+        setup_array, list(target_chunks.items()), setup_workers
+    )
+
+    intermediate = None if temp_group is None else temp_group.group
+    return copy_specs, intermediate, target_group
+
+
+def _setup_single_array_rechunk(
+    source,
+    target_chunks,
+    max_mem,
+    target_store,
+    target_options,
+    temp_store,
+    temp_options,
+    array_name,
+    min_mem,
+    setup_workers,
+):
+    if (
+        isinstance(target_store, zarr.Group) or isinstance(temp_store, zarr.Group)
+    ) and array_name is None:
+        raise ValueError("Can't rechunk to a group without a name for the array.")
+
+    copy_spec, stage_group = _setup_array_rechunk(
+        source,
+        target_chunks,
+        max_mem,
+        target_store,
+        target_options=target_options,
+        temp_store_or_group=temp_store,
+        temp_options=temp_options,
+        name=array_name,
+        min_mem=min_mem,
+    )
+    if isinstance(copy_spec, CopySpec):
         intermediate = copy_spec.intermediate.array
         target = copy_spec.write.array
-        return [copy_spec], intermediate, target
-
     else:
-        raise ValueError(
-            f"Source must be a Zarr Array, Zarr Group, Dask Array or Xarray Dataset (not {type(source)})."
+        # multi-stage rechunking keeps its temporary arrays in one group
+        intermediate = stage_group
+        target = copy_spec[-1].write.array
+    return [copy_spec], intermediate, target
+
+
+@lru_cache(maxsize=128)
+def _cached_rechunking_plan(
+    shape, source_chunks, target_chunks, itemsize, min_mem, max_mem, consolidate_reads
+):
+    # arrays in a group or dataset often share shape and chunks, so identical
+    # plans are only computed once
+    return tuple(
+        multistage_rechunking_plan(
+            shape,
+            source_chunks,
+            target_chunks,
+            itemsize,
+            min_mem,
+            max_mem,
+            consolidate_reads=consolidate_reads,
         )
+    )
+
+
+def _missing_temp_store_error(name):
+    return ValueError(
+        "A temporary store location must be provided{}.".format(
+            f" (array={name})" if name else ""
+        )
+    )
+
+
+def _temp_array_name(name, suffix):
+    # name of an array in the temporary group used by multi-stage rechunking
+    return f"{name}-{suffix}" if name else suffix
 
 
 def _setup_array_rechunk(
@@ -556,10 +769,12 @@ def _setup_array_rechunk(
     temp_store_or_group=None,
     temp_options=None,
     name=None,
-) -> CopySpec:
+    min_mem=None,
+) -> Tuple[Union[CopySpec, StagedCopySpec], Optional[zarr.Group]]:
     _validate_options(target_options)
     _validate_options(temp_options)
-    shape = source_array.shape
+    # ensure python ints for serialization (and hashable plan arguments)
+    shape = tuple(int(x) for x in source_array.shape)
     source_chunks = (
         source_array.chunksize
         if isinstance(source_array, dask.array.Array)
@@ -567,6 +782,10 @@ def _setup_array_rechunk(
     )
     dtype = source_array.dtype
     itemsize = dtype.itemsize
+    # fetch the source attributes once, rather than key by key
+    source_attrs = getattr(source_array, "attrs", None)
+    if source_attrs is not None:
+        source_attrs = source_attrs.asdict()
 
     if target_chunks is None:
         # this is just a pass-through copy
@@ -582,26 +801,26 @@ def _setup_array_rechunk(
                 f"Got array_dims {array_dims}, target_chunks {target_chunks}."
             )
 
-    # TODO: rewrite to avoid the hard dependency on dask
-    max_mem = dask.utils.parse_bytes(max_mem)
+    # by default, require nothing more than single stage intermediates
+    if min_mem is None:
+        min_mem = itemsize
+
+    source_chunks = tuple(int(x) for x in source_chunks)
+    target_chunks = tuple(int(x) for x in target_chunks)
 
     # don't consolidate reads for Dask arrays
     consolidate_reads = isinstance(source_array, zarr.core.Array)
-    read_chunks, int_chunks, write_chunks = rechunking_plan(
+    stages = _cached_rechunking_plan(
         shape,
         source_chunks,
         target_chunks,
         itemsize,
+        min_mem,
         max_mem,
-        consolidate_reads=consolidate_reads,
+        consolidate_reads,
     )
 
     # create target
-    shape = tuple(int(x) for x in shape)  # ensure python ints for serialization
-    target_chunks = tuple(int(x) for x in target_chunks)
-    int_chunks = tuple(int(x) for x in int_chunks)
-    write_chunks = tuple(int(x) for x in write_chunks)
-
     target_array = _zarr_empty(
         shape,
         target_store_or_group,
@@ -610,31 +829,69 @@ def _setup_array_rechunk(
         name=name,
         **(target_options or {}),
     )
-    try:
-        target_array.attrs.update(source_array.attrs)
-    except AttributeError:
-        pass
+    if source_attrs:
+        target_array.attrs.update(source_attrs)
 
-    if read_chunks == write_chunks or read_chunks == int_chunks:
-        int_array = None
-    else:
-        # do intermediate store
+    multistage = len(stages) > 1
+    if multistage:
+        # each stage writes an array which is read by the next one
         if temp_store_or_group is None:
-            raise ValueError(
-                "A temporary store location must be provided{}.".format(
-                    f" (array={name})" if name else ""
-                )
+            raise _missing_temp_store_error(name)
+        if isinstance(temp_store_or_group, _DeferredGroup):
+            temp_store_or_group = temp_store_or_group.get()
+        elif not isinstance(temp_store_or_group, zarr.Group):
+            temp_store_or_group = zarr.group(temp_store_or_group)
+
+    copy_specs = []
+    stage_source = source_array
+    for n, (read_chunks, int_chunks, write_chunks) in enumerate(stages):
+        int_chunks = tuple(int(x) for x in int_chunks)
+        write_chunks = tuple(int(x) for x in write_chunks)
+
+        if n == len(stages) - 1:
+            stage_target = target_array
+        else:
+            stage_target = _zarr_empty(
+                shape,
+                temp_store_or_group,
+                write_chunks,
+                dtype,
+                name=_temp_array_name(name, f"stage{n}"),
+                **(temp_options or {}),
             )
-        int_array = _zarr_empty(
-            shape,
-            temp_store_or_group,
-            int_chunks,
-            dtype,
-            name=name,
-            **(temp_options or {}),
+
+        if read_chunks == write_chunks or read_chunks == int_chunks:
+            int_array = None
+        else:
+            # do intermediate store
+            if temp_store_or_group is None:
+                raise _missing_temp_store_error(name)
+            if isinstance(temp_store_or_group, _DeferredGroup):
+                temp_store_or_group = temp_store_or_group.get()
+            int_array = _zarr_empty(
+                shape,
+                temp_store_or_group,
+                int_chunks,
+                dtype,
+                name=_temp_array_name(name, f"stage{n}-intermediate")
+                if multistage
+                else name,
+                **(temp_options or {}),
+            )
+
+        read_proxy = ArrayProxy(stage_source, read_chunks)
+        int_proxy = ArrayProxy(int_array, int_chunks)
+        write_proxy = ArrayProxy(stage_target, write_chunks)
+        # copy tasks read at most a chunk of the largest of these sizes
+        max_buf = (
+            int(max(map(prod, [read_chunks, int_chunks, write_chunks]))) * itemsize
+        )
+        copy_specs.append(
+            CopySpec(read_proxy, int_proxy, write_proxy, BufferPool(max_buf))
         )
+        stage_source = stage_target
 
-    read_proxy = ArrayProxy(source_array, read_chunks)
-    int_proxy = ArrayProxy(int_array, int_chunks)
-    write_proxy = ArrayProxy(target_array, write_chunks)
-    return CopySpec(read_proxy, int_proxy, write_proxy)
+    # also return the group holding the arrays of the intermediate stages
+    if not multistage:
+        return copy_specs[0], None
+    return tuple(copy_specs), temp_store_or_group
@@ -0,0 +1,81 @@
+"""Reusable NumPy buffers for copy tasks."""
+import threading
+import weakref
+from math import prod
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class _Slot:
+    # holds the buffer retained by one thread
+    buffer: Optional[np.ndarray] = None
+
+
+class BufferPool:
+    """A pool of reusable NumPy buffers for the copy tasks of one array.
+
+    Each thread retains at most one released buffer, which is reused by its
+    next :py:meth:`acquire` for up to as many bytes. Retained buffers go away
+    with their thread, with the pool, or when the pool is cleared. A pickled
+    pool, e.g. sent to a remote worker along with its ``CopySpec``, is
+    unpickled empty.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Size of the largest buffer retained by a thread, usually the size of
+        the largest chunk read by the copy tasks.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._slots: "weakref.WeakSet[_Slot]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return type(self), (self.max_bytes,)
+
+    def _thread_slot(self) -> _Slot:
+        try:
+            return self._local.slot
+        except AttributeError:
+            slot = self._local.slot = _Slot()
+            with self._lock:
+                self._slots.add(slot)
+            return slot
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes retained by all threads."""
+        with self._lock:
+            slots = list(self._slots)
+        return sum(slot.buffer.nbytes for slot in slots if slot.buffer is not None)
+
+    def acquire(self, shape: Sequence[int], dtype, order: str = "C") -> np.ndarray:
+        """Return an uninitialized array with the given shape and dtype."""
+        dtype = np.dtype(dtype)
+        nbytes = prod(shape) * dtype.itemsize
+        slot = self._thread_slot()
+        buffer, slot.buffer = slot.buffer, None
+        if buffer is None or buffer.nbytes < nbytes:
+            buffer = np.empty(nbytes, dtype="u1")
+        return buffer[:nbytes].view(dtype).reshape(shape, order=order)
+
+    def release(self, array: np.ndarray) -> None:
+        """Return an array obtained from :py:meth:`acquire` to the pool."""
+        # views share the base of the buffer they were taken from
+        buffer = array if array.base is None else array.base
+        if buffer.nbytes > self.max_bytes:
+            return
+        slot = self._thread_slot()
+        if slot.buffer is None or slot.buffer.nbytes < buffer.nbytes:
+            slot.buffer = buffer
+
+    def clear(self) -> None:
+        """Drop the buffers retained by every thread."""
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot.buffer = None
@@ -1,5 +1,5 @@
 import uuid
-from typing import Iterable, Iterator, Mapping, Tuple
+from typing import Iterable, Iterator, Mapping, Tuple, Union
 
 import apache_beam as beam
 
@@ -8,7 +8,13 @@ from rechunker.executors.util import (
     chunk_keys,
     split_into_direct_copies,
 )
-from rechunker.types import CopySpec, CopySpecExecutor, ReadableArray, WriteableArray
+from rechunker.types import (
+    CopySpec,
+    CopySpecExecutor,
+    ReadableArray,
+    StagedCopySpec,
+    WriteableArray,
+)
 
 
 class BeamExecutor(CopySpecExecutor[beam.PTransform]):
@@ -25,7 +31,9 @@ class BeamExecutor(CopySpecExecutor[beam.PTransform]):
     # operations instead of explicitly writing intermediate arrays to disk.
     # This would offer a cleaner API and would perhaps be faster, too.
 
-    def prepare_plan(self, specs: Iterable[CopySpec]) -> beam.PTransform:
+    def prepare_plan(
+        self, specs: Iterable[Union[CopySpec, StagedCopySpec]]
+    ) -> beam.PTransform:
         return "Rechunker" >> _Rechunker(specs)
 
     def execute_plan(self, plan: beam.PTransform, **kwargs):
@@ -34,7 +42,7 @@ class BeamExecutor(CopySpecExecutor[beam.PTransform]):
 
 
 class _Rechunker(beam.PTransform):
-    def __init__(self, specs: Iterable[CopySpec]):
+    def __init__(self, specs: Iterable[Union[CopySpec, StagedCopySpec]]):
         super().__init__()
         self.direct_specs = tuple(map(split_into_direct_copies, specs))
 
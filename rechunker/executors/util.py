@@ -1,8 +1,8 @@
 import itertools
 import math
-from typing import Iterator, NamedTuple, Tuple
+from typing import Iterator, NamedTuple, Tuple, Union
 
-from rechunker.types import CopySpec, ReadableArray, WriteableArray
+from rechunker.types import CopySpec, ReadableArray, StagedCopySpec, WriteableArray
 
 
 def chunk_keys(
@@ -30,9 +30,13 @@ class DirectCopySpec(NamedTuple):
     chunks: Tuple[int, ...]
 
 
-def split_into_direct_copies(spec: CopySpec) -> Tuple[DirectCopySpec, ...]:
+def split_into_direct_copies(
+    spec: Union[CopySpec, StagedCopySpec]
+) -> Tuple[DirectCopySpec, ...]:
     """Convert a rechunked copy into a list of direct copies."""
-    if spec.intermediate.array is None:
+    if not isinstance(spec, CopySpec):
+        return tuple(copy for part in spec for copy in split_into_direct_copies(part))
+    elif spec.intermediate.array is None:
         return (
             DirectCopySpec(
                 spec.read.array,
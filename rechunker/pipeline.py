@@ -1,11 +1,20 @@
+import functools
 import itertools
 import math
-from typing import Any, Iterable, Iterator, Tuple
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
 
 import dask
 import numpy as np
+import zarr
 
-from .types import CopySpec, CopySpecExecutor, ParallelPipelines, Pipeline, Stage
+from .types import (
+    CopySpec,
+    CopySpecExecutor,
+    ParallelPipelines,
+    Pipeline,
+    Stage,
+    StagedCopySpec,
+)
 
 
 def chunk_keys(
@@ -25,27 +34,166 @@ def chunk_keys(
         )
 
 
-def copy_read_to_write(chunk_key, *, config=CopySpec):
+def _is_unencoded(array) -> bool:
+    # Zarr arrays without filters or compressor store each chunk as the raw
+    # bytes of the chunk array.
+    return (
+        isinstance(array, zarr.Array)
+        and array.compressor is None
+        and not array.filters
+        and array.dtype != object
+    )
+
+
+def _whole_chunk_coords(array, chunk_key) -> Optional[Tuple[int, ...]]:
+    # coordinates of the chunk selected by chunk_key, if it selects exactly
+    # one whole chunk of an unencoded Zarr array
+    if not (chunk_key and _is_unencoded(array)):
+        return None
+    chunks = array.chunks
+    if not all(
+        k.start % c == 0 and k.stop - k.start == c for k, c in zip(chunk_key, chunks)
+    ):
+        return None
+    return tuple(k.start // c for k, c in zip(chunk_key, chunks))
+
+
+def read_chunk(array, chunk_key, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Read ``array[chunk_key]`` into a NumPy array.
+
+    When ``chunk_key`` selects exactly one whole chunk of an unencoded Zarr
+    array, the stored chunk bytes are viewed as an array in place instead of
+    being copied into a newly allocated output array. Otherwise, Zarr arrays
+    are read into ``out`` if it is given.
+    """
+    chunk_coords = _whole_chunk_coords(array, chunk_key)
+    if chunk_coords is not None:
+        try:
+            cdata = array.chunk_store[array._chunk_key(chunk_coords)]
+        except KeyError:
+            pass
+        else:
+            return np.frombuffer(cdata, dtype=array.dtype).reshape(
+                array.chunks, order=array.order
+            )
+    if out is not None and isinstance(array, zarr.Array):
+        return array.get_basic_selection(chunk_key, out=out)
     with dask.config.set(scheduler="single-threaded"):
-        data = np.asarray(config.read.array[chunk_key])
-    config.write.array[chunk_key] = data
+        return np.asarray(array[chunk_key])
+
+
+def write_chunk(array, chunk_key, data):
+    """Write ``data`` to ``array[chunk_key]``.
+
+    When ``chunk_key`` selects exactly one whole chunk of an unencoded Zarr
+    array, the data is stored directly as that chunk, bypassing Zarr's
+    selection and chunk assembly machinery.
+    """
+    chunk_coords = _whole_chunk_coords(array, chunk_key)
+    if chunk_coords is None or not array.write_empty_chunks:
+        array[chunk_key] = data
+    else:
+        data = np.asarray(data, dtype=array.dtype, order=array.order)
+        array.chunk_store[array._chunk_key(chunk_coords)] = array._encode_chunk(data)
+
+
+def _copy_chunk(source, target, chunk_key, buffer_pool):
+    # Zarr sources that are decoded are read into a pooled buffer, which is
+    # reused by later copy tasks on the same thread once it has been written.
+    if (
+        buffer_pool is not None
+        and isinstance(source, zarr.Array)
+        and not source.dtype.hasobject
+        and _whole_chunk_coords(source, chunk_key) is None
+    ):
+        shape = tuple(k.stop - k.start for k in chunk_key)
+        buffer = buffer_pool.acquire(shape, source.dtype)
+        try:
+            write_chunk(target, chunk_key, read_chunk(source, chunk_key, out=buffer))
+        finally:
+            buffer_pool.release(buffer)
+    else:
+        write_chunk(target, chunk_key, read_chunk(source, chunk_key))
+
+
+def copy_read_to_write(chunk_key, *, config=CopySpec):
+    _copy_chunk(config.read.array, config.write.array, chunk_key, config.buffer_pool)
 
 
 def copy_read_to_intermediate(chunk_key, *, config=CopySpec):
-    with dask.config.set(scheduler="single-threaded"):
-        data = np.asarray(config.read.array[chunk_key])
-    config.intermediate.array[chunk_key] = data
+    _copy_chunk(
+        config.read.array, config.intermediate.array, chunk_key, config.buffer_pool
+    )
 
 
 def copy_intermediate_to_write(chunk_key, *, config=CopySpec):
-    with dask.config.set(scheduler="single-threaded"):
-        data = np.asarray(config.intermediate.array[chunk_key])
-    config.write.array[chunk_key] = data
+    _copy_chunk(
+        config.intermediate.array, config.write.array, chunk_key, config.buffer_pool
+    )
+
+
+def copy_raw_chunks(chunk_key, *, config=CopySpec):
+    # copy the encoded source chunks within chunk_key to the target as they are
+    source = config.read.array
+    target = config.write.array
+    chunk_ranges = [
+        range(k.start // c, math.ceil(k.stop / c))
+        for k, c in zip(chunk_key, source.chunks)
+    ]
+    for chunk_coords in itertools.product(*chunk_ranges):
+        try:
+            data = source.chunk_store[source._chunk_key(chunk_coords)]
+        except KeyError:
+            # missing chunks are filled with the source fill_value, which may
+            # differ from the target fill_value
+            source_key = tuple(
+                slice(c * i, min(c * (i + 1), s))
+                for i, s, c in zip(chunk_coords, source.shape, source.chunks)
+            )
+            write_chunk(target, source_key, read_chunk(source, source_key))
+        else:
+            target.chunk_store[target._chunk_key(chunk_coords)] = data
+
+
+def _is_raw_copy(spec: CopySpec) -> bool:
+    # Direct copies between Zarr arrays that share chunks and encoding can
+    # copy the encoded chunks as they are, without decoding and re-encoding.
+    source = spec.read.array
+    target = spec.write.array
+    if spec.intermediate.array is not None:
+        return False
+    if not (isinstance(source, zarr.Array) and isinstance(target, zarr.Array)):
+        return False
+    if not all(
+        getattr(source, attr) == getattr(target, attr)
+        for attr in ["shape", "chunks", "dtype", "compressor", "filters", "order"]
+    ):
+        return False
+    # each write block must cover whole chunks
+    return all(
+        w % c == 0 or w >= s
+        for w, c, s in zip(spec.write.chunks, source.chunks, source.shape)
+    )
+
 
+def spec_to_pipeline(spec: Union[CopySpec, StagedCopySpec]) -> Pipeline:
+    if not isinstance(spec, CopySpec):
+        return _staged_spec_to_pipeline(spec)
 
-def spec_to_pipeline(spec: CopySpec) -> Pipeline:
     # typing won't work until we start using numpy types
     shape = spec.read.array.shape  # type: ignore
+    if _is_raw_copy(spec):
+        # encoded chunks are copied as they are, without read buffers
+        return Pipeline(
+            [
+                Stage(
+                    copy_raw_chunks,
+                    "copy_raw_chunks",
+                    mappable=chunk_keys(shape, spec.write.chunks),
+                )
+            ],
+            config=spec,
+        )
     if spec.intermediate.array is None:
         stages = [
             Stage(
@@ -67,15 +215,51 @@ def spec_to_pipeline(spec: CopySpec) -> Pipeline:
                 mappable=chunk_keys(shape, spec.write.chunks),
             ),
         ]
+    if spec.buffer_pool is not None:
+        # drop the buffers retained by the copy tasks once they are done
+        stages.append(Stage(release_buffers, "release_buffers"))
     return Pipeline(stages, config=spec)
 
 
-def specs_to_pipelines(specs: Iterable[CopySpec]) -> ParallelPipelines:
+def release_buffers(*, config=CopySpec):
+    config.buffer_pool.clear()
+
+
+def _copy_stage_of(chunk_key, *, config, function, index):
+    # run a copy function against one CopySpec of a StagedCopySpec
+    function(chunk_key, config=config[index])
+
+
+def _run_stage_of(*, config, function, index):
+    # run a standalone function against one CopySpec of a StagedCopySpec
+    function(config=config[index])
+
+
+def _staged_spec_to_pipeline(specs: StagedCopySpec) -> Pipeline:
+    # chain the stages of each CopySpec into a single sequential pipeline
+    stages = []
+    for index, spec in enumerate(specs):
+        for stage in spec_to_pipeline(spec).stages:
+            if stage.mappable is None:
+                function = functools.partial(
+                    _run_stage_of, function=stage.function, index=index
+                )
+            else:
+                function = functools.partial(
+                    _copy_stage_of, function=stage.function, index=index
+                )
+            stages.append(Stage(function, f"{stage.name}-{index}", stage.mappable))
+    return Pipeline(stages, config=specs)
+
+
+def specs_to_pipelines(
+    specs: Iterable[Union[CopySpec, StagedCopySpec]]
+) -> ParallelPipelines:
     return tuple((spec_to_pipeline(spec) for spec in specs))
 
 
 class CopySpecToPipelinesMixin(CopySpecExecutor):
-    def prepare_plan(self, specs: Iterable[CopySpec]):
+    def prepare_plan(self, specs: Iterable[Union[CopySpec, StagedCopySpec]]):
         pipelines = specs_to_pipelines(specs)
         return self.pipelines_to_plan(pipelines)
 
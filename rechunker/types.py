@@ -14,6 +14,8 @@ from typing import (
 
 from mypy_extensions import NamedArg
 
+from rechunker.bufferpool import BufferPool
+
 # TODO: replace with Protocols, once Python 3.8+ is required
 Array = Any
 ReadableArray = Any
@@ -53,12 +55,20 @@ class CopySpec(NamedTuple):
         but they are provided for convenience.
     write : ArrayProxy
         Write proxy with an ``array`` attribute that supports ``__setitem__``.
+    buffer_pool : BufferPool, optional
+        Pool of buffers reused by the copy tasks to read chunks, sized for the
+        largest of the read, intermediate and write chunks.
     """
 
     read: ArrayProxy
     intermediate: ArrayProxy
     write: ArrayProxy
+    buffer_pool: Optional[BufferPool] = None
+
 
+# StagedCopySpec contains CopySpecs to be executed one after another, with each
+# CopySpec reading the array written by the one before it
+StagedCopySpec = Tuple[CopySpec, ...]
 
 Config = Any  # TODO: better typing for config
 SingleArgumentStageFunction = Callable[
@@ -112,7 +122,7 @@ class CopySpecExecutor(Generic[T]):
     convenient for users of that executor.
     """
 
-    def prepare_plan(self, specs: Iterable[CopySpec]) -> T:
+    def prepare_plan(self, specs: Iterable[Union[CopySpec, StagedCopySpec]]) -> T:
         """Convert copy specifications into a plan."""
         raise NotImplementedError
 
@@ -0,0 +1,98 @@
+import gc
+import pickle
+import threading
+
+import numpy as np
+import zarr
+
+from rechunker import api
+from rechunker.bufferpool import BufferPool
+from rechunker.pipeline import spec_to_pipeline
+
+
+def test_buffer_pool_reuses_buffers():
+    pool = BufferPool(max_bytes=160)
+    first = pool.acquire((4, 5), "f8")
+    assert first.shape == (4, 5) and first.dtype == "f8"
+    pool.release(first)
+    # a retained buffer is reused for any shape and dtype that fits in it
+    second = pool.acquire((10, 2), "i8", order="F")
+    assert second.shape == (10, 2) and second.dtype == "i8"
+    assert np.shares_memory(first, second)
+    pool.release(second)
+    third = pool.acquire((3,), "f4")
+    assert np.shares_memory(first, third)
+    pool.release(third)
+    assert pool.nbytes == 160
+
+
+def test_buffer_pool_max_bytes():
+    pool = BufferPool(max_bytes=100)
+    first = pool.acquire((20,), "f8")
+    pool.release(first)
+    assert pool.nbytes == 0
+    assert not np.shares_memory(first, pool.acquire((20,), "f8"))
+
+
+def test_buffer_pool_clear():
+    pool = BufferPool(max_bytes=80)
+
+    def use_pool():
+        pool.release(pool.acquire((10,), "f8"))
+
+    use_pool()
+    thread = threading.Thread(target=use_pool)
+    thread.start()
+    use_pool()
+    assert pool.nbytes >= 80
+    pool.clear()
+    assert pool.nbytes == 0
+    thread.join()
+
+
+def test_buffer_pool_drops_buffers_of_finished_threads():
+    pool = BufferPool(max_bytes=80)
+    threads = [
+        threading.Thread(target=lambda: pool.release(pool.acquire((10,), "f8")))
+        for _ in range(50)
+    ]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    gc.collect()
+    assert len(pool._slots) == 0
+    assert pool.nbytes == 0
+
+
+def test_buffer_pool_pickles_empty():
+    pool = BufferPool(max_bytes=80)
+    pool.release(pool.acquire((10,), "f8"))
+    unpickled = pickle.loads(pickle.dumps(pool))
+    assert unpickled.max_bytes == 80
+    assert unpickled.nbytes == 0
+
+
+def test_copy_spec_buffer_pool(tmp_path):
+    source = zarr.ones((100, 100), chunks=(100, 1), store=str(tmp_path / "a.zarr"))
+    (copy_spec,), _, _ = api._setup_rechunk(
+        source,
+        (1, 100),
+        "1MB",
+        str(tmp_path / "target.zarr"),
+        temp_store=str(tmp_path / "temp.zarr"),
+    )
+    # sized for the largest chunk read by the copy tasks
+    pool = copy_spec.buffer_pool
+    chunks = [copy_spec.read.chunks, copy_spec.intermediate.chunks]
+    assert pool.max_bytes == max(map(np.prod, chunks)) * source.dtype.itemsize
+
+    pipeline = spec_to_pipeline(copy_spec)
+    *copy_stages, release_stage = pipeline.stages
+    assert release_stage.name == "release_buffers"
+    for stage in copy_stages:
+        for chunk_key in stage.mappable:
+            stage.function(chunk_key, config=copy_spec)
+    assert pool.nbytes > 0
+    release_stage.function(config=copy_spec)
+    assert pool.nbytes == 0
+    np.testing.assert_equal(zarr.open(str(tmp_path / "target.zarr"))[:], 1)
@@ -9,6 +9,7 @@ import numpy
 import numpy as np
 import pytest
 import zarr
+from dask.delayed import Delayed
 from zarr.storage import LocalStore
 
 from rechunker import api
@@ -41,6 +42,10 @@ def test_invalid_executor():
         api._get_executor("unknown")
 
 
+def test_get_executor_is_cached():
+    assert api._get_executor("python") is api._get_executor("PYTHON")
+
+
 @pytest.fixture(scope="session")
 def chunk_ds():
     xarray = pytest.importorskip("xarray")
@@ -736,6 +741,21 @@ def test_rechunk_invalid_option(rechunk_args):
                 api.rechunk(**rechunk_args, target_options=options)
 
 
+@pytest.mark.parametrize(
+    "target_chunks, error",
+    [
+        ({"a": (5, 10), "b": (100,)}, ValueError),
+        ({"a": {"x": 5, "y": 10}, "b": (100,)}, KeyError),
+    ],
+)
+def test_rechunk_dataset_invalid_chunks_before_write(tmp_path, target_chunks, error):
+    ds = sample_xarray_dataset()
+    target_store = tmp_path / "target.zarr"
+    with pytest.raises(error, match="variable=a"):
+        api.rechunk(ds, target_chunks, "10MB", str(target_store))
+    assert not target_store.exists()
+
+
 def test_rechunk_bad_target_chunks(rechunk_args):
     if not _is_collection(rechunk_args["source"]):
         return
@@ -771,7 +791,17 @@ def test_no_intermediate():
     b = zarr.ones((4, 4), chunks=(4, 1))
     rechunked = api.Rechunked(None, None, source=a, intermediate=None, target=b)
     assert "Intermediate" not in repr(rechunked)
-    rechunked._repr_html_()
+    assert "Intermediate" not in rechunked._repr_html_()
+
+
+def test_repr_html_fallback():
+    a = zarr.ones((4, 4), chunks=(2, 2))
+    b = zarr.ones((4, 4), chunks=(2, 1))
+    c = zarr.ones((4, 4), chunks=(4, 1))
+    rechunked = api.Rechunked(None, None, source=a, intermediate=b, target=c)
+    result = rechunked._repr_html_()
+    assert "Intermediate" in result
+    assert result.count("&lt;zarr.core.Array (4, 4) float64&gt;") == 3
 
 
 def test_no_intermediate_fused(tmp_path):
@@ -839,3 +869,264 @@ def test_rechunk_group_to_group_with_name(tmp_path):
             target_group,
             array_name="foo",
         )
+
+
+def test_rechunk_group_reuses_plan(tmp_path):
+    group = zarr.group(str(tmp_path / "source.zarr"))
+    for name in ["a", "b", "c"]:
+        group.ones(name, shape=(100, 100), chunks=(100, 1), dtype="f4")
+    target_chunks = {name: (1, 100) for name in group.array_keys()}
+
+    api._cached_rechunking_plan.cache_clear()
+    api.rechunk(
+        group,
+        target_chunks,
+        "1MB",
+        str(tmp_path / "target.zarr"),
+        temp_store=str(tmp_path / "temp.zarr"),
+    )
+    info = api._cached_rechunking_plan.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_rechunk_group_dask_plan_per_array(tmp_path):
+    group = zarr.group(str(tmp_path / "source.zarr"))
+    for name in ["a", "b", "c"]:
+        group.ones(name, shape=(100, 100), chunks=(100, 1), dtype="f4")
+    target_chunks = {name: (1, 100) for name in group.array_keys()}
+
+    rechunked = api.rechunk(
+        group,
+        target_chunks,
+        "1MB",
+        str(tmp_path / "target.zarr"),
+        temp_store=str(tmp_path / "temp.zarr"),
+        executor="dask",
+    )
+    assert len(rechunked.plan) == 3
+    assert all(isinstance(delayed, Delayed) for delayed in rechunked.plan)
+
+
+@pytest.mark.parametrize("executor", ["dask", "python", requires_beam("beam")])
+@pytest.mark.parametrize(
+    "source_type, size, max_mem, min_mem",
+    [("zarr", 1000, 40000, 1000), ("dask", 200, 8000, 200)],
+)
+def test_rechunk_multistage(tmp_path, executor, source_type, size, max_mem, min_mem):
+    shape = (size, size)
+    data = np.arange(np.prod(shape), dtype="f4").reshape(shape)
+    source = zarr.array(data, chunks=(size, 1), store=str(tmp_path / "source.zarr"))
+    if source_type == "dask":
+        source = dsa.from_zarr(source)
+
+    target_store = str(tmp_path / "target.zarr")
+    rechunked = api.rechunk(
+        source,
+        (1, size),
+        max_mem=max_mem,
+        target_store=target_store,
+        temp_store=str(tmp_path / "temp.zarr"),
+        executor=executor,
+        min_mem=min_mem,
+    )
+    assert isinstance(rechunked._intermediate, zarr.Group)
+    assert len(list(rechunked._intermediate.array_keys())) > 1
+
+    result = rechunked.execute()
+    assert result.chunks == (1, size)
+    np.testing.assert_equal(zarr.open(target_store, mode="r")[:], data)
+
+
+def test_rechunk_multistage_group(tmp_path):
+    group = zarr.group(str(tmp_path / "source.zarr"))
+    data = np.arange(1000000, dtype="f4").reshape(1000, 1000)
+    group.array("a", data, chunks=(1000, 1))
+    group.array("b", data[0], chunks=(100,))
+
+    target_group = zarr.group(str(tmp_path / "target.zarr"))
+    rechunked = api.rechunk(
+        group,
+        {"a": (1, 1000), "b": (1000,)},
+        max_mem=40000,
+        target_store=target_group,
+        temp_store=str(tmp_path / "temp.zarr"),
+        min_mem=1000,
+    )
+    rechunked.execute()
+    assert target_group["a"].chunks == (1, 1000)
+    np.testing.assert_equal(target_group["a"][:], data)
+    np.testing.assert_equal(target_group["b"][:], data[0])
+
+
+def test_rechunk_multistage_no_temp_store(tmp_path):
+    source = zarr.ones((1000, 1000), chunks=(1000, 1), dtype="f4")
+    with pytest.raises(ValueError, match="A temporary store location must"):
+        api.rechunk(
+            source,
+            (1, 1000),
+            max_mem=40000,
+            target_store=str(tmp_path / "target.zarr"),
+            min_mem=1000,
+        )
+
+
+def test_rechunk_multistage_temp_group(tmp_path):
+    data = np.arange(1000000, dtype="f4").reshape(1000, 1000)
+    source = zarr.array(data, chunks=(1000, 1), store=str(tmp_path / "source.zarr"))
+    chunk_store = zarr.MemoryStore()
+    temp_group = zarr.group(store=zarr.MemoryStore(), chunk_store=chunk_store)
+
+    target_store = str(tmp_path / "target.zarr")
+    rechunked = api.rechunk(
+        source,
+        (1, 1000),
+        max_mem=40000,
+        target_store=target_store,
+        temp_store=temp_group,
+        min_mem=1000,
+        array_name="a",
+    )
+    assert rechunked._intermediate is temp_group
+    rechunked.execute()
+    assert len(chunk_store) > 0
+    np.testing.assert_equal(zarr.open(target_store, mode="r")[:], data)
+
+
+@pytest.mark.parametrize("executor", ["dask", "python"])
+@pytest.mark.parametrize(
+    "max_mem, write_chunks", [("1MB", (10, 10)), ("200B", (4, 10)), ("100B", (4, 4))]
+)
+def test_rechunk_pass_through_copies_raw_chunks(
+    tmp_path, executor, max_mem, write_chunks
+):
+    from rechunker.pipeline import chunk_keys, spec_to_pipeline
+
+    source = zarr.full(
+        (10, 10), 5, chunks=(4, 4), dtype="i4", store=str(tmp_path / "source.zarr")
+    )
+    # leave the last chunk missing, so it must be filled from fill_value
+    source[:8, :8] = np.arange(64).reshape(8, 8)
+
+    copy_specs, _, _ = api._setup_rechunk(
+        source, None, max_mem, str(tmp_path / "plan.zarr")
+    )
+    assert copy_specs[0].write.chunks == write_chunks
+    (stage,) = spec_to_pipeline(copy_specs[0]).stages
+    assert stage.name == "copy_raw_chunks"
+    # one task per consolidated write block, not per source chunk
+    assert list(stage.mappable) == list(chunk_keys(source.shape, write_chunks))
+
+    target_store = str(tmp_path / "target.zarr")
+    api.rechunk(source, None, max_mem, target_store, executor=executor).execute()
+    target = zarr.open(target_store, mode="r")
+    np.testing.assert_equal(target[:], source[:])
+
+
+def test_rechunk_pass_through_new_encoding(tmp_path):
+    from rechunker.pipeline import spec_to_pipeline
+
+    source = sample_zarr_array(tmp_path)
+    copy_specs, _, _ = api._setup_rechunk(
+        source,
+        None,
+        "100MB",
+        str(tmp_path / "target.zarr"),
+        target_options={"compressor": None},
+    )
+    stage, release_stage = spec_to_pipeline(copy_specs[0]).stages
+    assert stage.name == "copy_read_to_write"
+    assert release_stage.name == "release_buffers"
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_write_chunk_unencoded(tmp_path, order):
+    from rechunker.pipeline import chunk_keys, write_chunk
+
+    data = np.arange(100, dtype="i8").reshape(10, 10)
+    kwargs = dict(shape=(10, 10), chunks=(4, 5), dtype="f4", order=order)
+    expected = zarr.create(store=str(tmp_path / "expected.zarr"), **kwargs)
+    target = zarr.create(store=str(tmp_path / "target.zarr"), compressor=None, **kwargs)
+    for chunk_key in chunk_keys(data.shape, target.chunks):
+        expected[chunk_key] = data[chunk_key]
+        write_chunk(target, chunk_key, data[chunk_key])
+
+    np.testing.assert_equal(target[:], expected[:])
+    assert target.nchunks_initialized == target.nchunks
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_read_chunk_unencoded(tmp_path, order):
+    from rechunker.pipeline import chunk_keys, read_chunk
+
+    source = zarr.create(
+        store=str(tmp_path / "source.zarr"),
+        shape=(10, 10),
+        chunks=(4, 5),
+        dtype=">f8",
+        order=order,
+        compressor=None,
+        fill_value=-1,
+    )
+    # leave the last row of chunks missing
+    source[:8] = np.arange(80).reshape(8, 10)
+    for chunk_key in chunk_keys(source.shape, (4, 5)):
+        np.testing.assert_equal(read_chunk(source, chunk_key), source[chunk_key])
+
+
+def test_rechunk_group_unused_temp_store(tmp_path):
+    source_group = sample_zarr_group(tmp_path)
+    target_chunks = {aname: source_group[aname].chunks for aname in source_group}
+    temp_store = tmp_path / "temp.zarr"
+    rechunked = api.rechunk(
+        source_group,
+        target_chunks,
+        "100MB",
+        str(tmp_path / "target.zarr"),
+        temp_store=str(temp_store),
+    )
+    assert "Intermediate" not in repr(rechunked)
+    assert not temp_store.exists()
+
+
+@pytest.mark.parametrize("setup_workers", [1, 4])
+def test_rechunk_group_setup_workers(tmp_path, setup_workers):
+    group = zarr.group(str(tmp_path / "source.zarr"))
+    names = [f"x{i}" for i in range(8)]
+    for i, name in enumerate(names):
+        group.array(name, np.full((20, 20), i, dtype="i4"), chunks=(20, 1))
+    target_chunks = {name: (1, 20) for name in names}
+
+    rechunked = api.rechunk(
+        group,
+        target_chunks,
+        "1MB",
+        str(tmp_path / "target.zarr"),
+        temp_store=str(tmp_path / "temp.zarr"),
+        executor="python",
+        setup_workers=setup_workers,
+    )
+    target = rechunked.execute()
+    for i, name in enumerate(names):
+        assert target[name].chunks == (1, 20)
+        np.testing.assert_equal(target[name][:], i)
+
+
+def test_rechunk_dataset_setup_workers(tmp_path):
+    xarray = pytest.importorskip("xarray")
+
+    ds = example_dataset((100, 50)).chunk({"x": 10, "y": 50})
+    target_chunks = {"a": (20, 10), "b": (20,)}
+    target_store = str(tmp_path / "target.zarr")
+    rechunked = api.rechunk(
+        ds,
+        target_chunks,
+        "10MB",
+        target_store,
+        temp_store=str(tmp_path / "temp.zarr"),
+        setup_workers=4,
+    )
+    rechunked.execute()
+    ds_target = xarray.open_zarr(target_store)
+    xarray.testing.assert_identical(ds_target.compute(), ds.compute())
+    assert ds_target.a.data.chunksize == (20, 10)